@@ -0,0 +1,88 @@
+"""
+Shared JSON extraction helpers for the enrichment modules.
+
+The previous per-module extraction ladder counted braces in a Python loop,
+one bytecode dispatch per character over multi-KB responses. The helpers
+here do the same job with a precompiled regex and C-implemented string
+scans.
+"""
+
+import re
+import json
+
+# Matches a ```json ... ``` or ``` ... ``` fenced block
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+def extract_json_text(response_text):
+    """
+    Extract the JSON payload from an LLM response
+
+    The model might wrap the JSON in markdown code fences or add text
+    before/after it, so strip that away before parsing.
+
+    Args:
+        response_text (str): Raw text returned by the LLM
+
+    Returns:
+        str: The extracted JSON text (best effort)
+    """
+    match = _FENCE_RE.search(response_text)
+    if match:
+        return match.group(1).strip()
+
+    # Slice from the first opening brace/bracket to the last closing one.
+    # Any residual imbalance is handled by the repair fallback, so a full
+    # balanced-match scan isn't needed here.
+    starts = [idx for idx in (response_text.find('{'), response_text.find('[')) if idx != -1]
+    if not starts:
+        return response_text.strip()
+
+    start_idx = min(starts)
+    close_char = '}' if response_text[start_idx] == '{' else ']'
+    end_idx = response_text.rfind(close_char)
+    if end_idx > start_idx:
+        return response_text[start_idx:end_idx + 1].strip()
+    return response_text[start_idx:].strip()
+
+def is_truncated_json(json_text):
+    """
+    Check whether JSON text looks cut off mid-structure
+
+    Args:
+        json_text (str): Candidate JSON text
+
+    Returns:
+        bool: True if there are more openers than closers
+    """
+    return (json_text.count('{') > json_text.count('}')
+            or json_text.count('[') > json_text.count(']'))
+
+def parse_partial_json(json_text):
+    """
+    Parse JSON that was cut off mid-structure (e.g. at a max_tokens limit)
+
+    Counts unclosed braces/brackets with C-implemented str.count rather than
+    a per-character Python scan, completes a dangling key with null, and
+    appends the missing closers before parsing. Truncation inside a string
+    literal is beyond this repair and is left to the json_repair fallback.
+
+    Args:
+        json_text (str): Truncated JSON text
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the completed text still cannot be parsed
+    """
+    json_text = json_text.rstrip()
+    if json_text.endswith(':'):
+        json_text += ' null'
+    elif json_text.endswith(','):
+        json_text = json_text[:-1]
+
+    open_brackets = json_text.count('[') - json_text.count(']')
+    open_braces = json_text.count('{') - json_text.count('}')
+    # In the entity schema arrays nest inside objects, so close brackets first
+    closers = ']' * max(open_brackets, 0) + '}' * max(open_braces, 0)
+    return json.loads(json_text + closers)
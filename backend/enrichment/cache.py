@@ -0,0 +1,219 @@
+"""
+LLM response cache module for HealthMap.
+
+This module provides a content-addressed disk cache for LLM enrichment
+responses. Re-running process_entity on unchanged scraped input would
+otherwise re-query the LLM and pay seconds of latency plus token cost for an
+answer we already have on disk.
+"""
+
+import os
+import math
+import hashlib
+import logging
+from collections import Counter
+
+import orjson
+from diskcache import Cache
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', 'data/llm_cache')
+LLM_CACHE_TTL = 7 * 86400  # Cache entries expire after 7 days
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.97'))
+
+class LLMCache:
+    """
+    Content-addressed disk cache for LLM responses
+
+    Keys are a SHA-256 hash of the model, system prompt, and user prompt, so
+    identical requests hit the cache and any change to the prompt or model
+    transparently misses.
+    """
+
+    def __init__(self, directory=LLM_CACHE_DIR, ttl=LLM_CACHE_TTL):
+        """
+        Initialize the cache
+
+        Args:
+            directory (str): Directory for the on-disk cache
+            ttl (int): Time-to-live for cache entries in seconds
+        """
+        self._cache = Cache(directory)
+        self.ttl = ttl
+
+    def make_key(self, model, system, prompt):
+        """
+        Build a content-addressed cache key for an LLM request
+
+        Args:
+            model (str): Model identifier
+            system: System prompt (string or content blocks)
+            prompt: User prompt (string or content blocks)
+
+        Returns:
+            str: SHA-256 hex digest identifying the request
+        """
+        payload = orjson.dumps({"model": model, "system": system, "prompt": prompt}, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        return self._cache.get(key)
+
+    def set(self, key, response):
+        """
+        Store a response in the cache
+
+        Args:
+            key (str): Cache key from make_key
+            response: The response data to cache
+        """
+        self._cache.set(key, response, expire=self.ttl)
+
+class SemanticCache:
+    """
+    Similarity cache that returns responses for near-duplicate prompts
+
+    Exact-key caching misses when scraped data changes slightly (e.g. a new
+    news item), even though the LLM answer would be the same. This cache
+    compares a bag-of-words cosine similarity between the incoming prompt and
+    previously answered prompts and returns the stored response when the
+    similarity clears a configurable threshold.
+    """
+
+    def __init__(self, directory=LLM_CACHE_DIR, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=LLM_CACHE_TTL):
+        """
+        Initialize the cache
+
+        Args:
+            directory (str): Base directory for the on-disk cache
+            threshold (float): Minimum cosine similarity for a hit (0-1)
+            ttl (int): Time-to-live for cache entries in seconds
+        """
+        self._cache = Cache(os.path.join(directory, 'semantic'))
+        self.threshold = threshold
+        self.ttl = ttl
+
+    @staticmethod
+    def _vectorize(text):
+        """
+        Convert text to a normalized bag-of-words vector
+
+        Args:
+            text (str): Text to vectorize
+
+        Returns:
+            dict: Mapping of token to normalized weight
+        """
+        counts = Counter(text.lower().split())
+        norm = math.sqrt(sum(count * count for count in counts.values()))
+        if norm == 0:
+            return {}
+        return {token: count / norm for token, count in counts.items()}
+
+    @staticmethod
+    def _cosine(vector_a, vector_b):
+        """
+        Compute the cosine similarity between two normalized vectors
+
+        Args:
+            vector_a (dict): First normalized vector
+            vector_b (dict): Second normalized vector
+
+        Returns:
+            float: Cosine similarity (0-1)
+        """
+        if len(vector_b) < len(vector_a):
+            vector_a, vector_b = vector_b, vector_a
+        return sum(weight * vector_b.get(token, 0.0) for token, weight in vector_a.items())
+
+    def get(self, prompt):
+        """
+        Look up a response for a near-duplicate of the given prompt
+
+        Args:
+            prompt (str): The prompt text to match
+
+        Returns:
+            The stored response of the most similar prompt above the
+            threshold, or None on a miss
+        """
+        query_vector = self._vectorize(prompt)
+        if not query_vector:
+            return None
+
+        best_similarity = 0.0
+        best_response = None
+        for key in self._cache:
+            entry = self._cache.get(key)
+            if not entry:
+                continue
+            similarity = self._cosine(query_vector, entry["vector"])
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_response = entry["response"]
+
+        if best_similarity >= self.threshold:
+            logger.info("Semantic cache hit (similarity: %.3f)", best_similarity)
+            return best_response
+        return None
+
+    def add(self, prompt, response):
+        """
+        Store a prompt/response pair for future similarity lookups
+
+        Args:
+            prompt (str): The prompt text
+            response: The response data to cache
+        """
+        key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        self._cache.set(key, {"vector": self._vectorize(prompt), "response": response}, expire=self.ttl)
+
+# Shared cache instances, created lazily so the cache directory is only
+# touched when caching is actually used
+_llm_cache = None
+_semantic_cache = None
+
+def get_llm_cache():
+    """
+    Return the shared LLMCache instance, or None if caching is disabled
+
+    Returns:
+        LLMCache: The shared cache, or None when LLM_CACHE_ENABLED is false
+    """
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
+
+def get_semantic_cache():
+    """
+    Return the shared SemanticCache instance, or None if disabled
+
+    Returns:
+        SemanticCache: The shared cache, or None when caching is disabled
+    """
+    global _semantic_cache
+    if not LLM_CACHE_ENABLED or not SEMANTIC_CACHE_ENABLED:
+        return None
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache()
+    return _semantic_cache
@@ -6,20 +6,328 @@ This module provides functions to enrich healthcare entity data using Anthropic'
 
 import os
 import json
+import time
+import threading
+import orjson
 import anthropic
+from json_repair import repair_json
 from dotenv import load_dotenv
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from backend.enrichment._json_extract import extract_json_text, is_truncated_json, parse_partial_json
+from backend.enrichment.cache import get_llm_cache, get_semantic_cache
+from backend.enrichment.schema import ENTITY_JSON_SCHEMA
+
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Remove any proxy settings from environment variables to avoid issues.
+# The client only reads these at construction time, so popping once at
+# import (before the shared client is built) is sufficient.
+os.environ.pop('HTTP_PROXY', None)
+os.environ.pop('HTTPS_PROXY', None)
+os.environ.pop('http_proxy', None)
+os.environ.pop('https_proxy', None)
+
 # Constants
 CLAUDE_API_KEY = os.getenv('CLAUDE_API_KEY')
-CLAUDE_MODEL = "claude-3-opus-20240229"  # Updated to a different model
+# Model routing: small Wikipedia stubs produce identical JSON from the small
+# model in a fraction of the time and cost, so only payloads above the
+# threshold go to the large model. Opus was dropped - it is the slowest of
+# the three with similar JSON fidelity for this extraction task.
+CLAUDE_MODEL_SMALL = os.getenv('CLAUDE_MODEL_SMALL', 'claude-3-5-haiku-latest')
+CLAUDE_MODEL_LARGE = os.getenv('CLAUDE_MODEL_LARGE', 'claude-3-5-sonnet-latest')
+MODEL_ROUTING_THRESHOLD = 3000  # characters of scraped payload
+
+# System prompt used for entity enrichment (single and batch)
+ENRICHMENT_SYSTEM_PROMPT = "You are a healthcare industry expert who extracts structured information about healthcare companies. IMPORTANT: Return ONLY the raw JSON object with no additional text, explanations, or markdown formatting."
+
+# Static instruction/schema block for entity enrichment. This is identical on
+# every call, so it is sent as a separate content block marked with
+# cache_control so Anthropic serves it from its prompt cache instead of
+# re-billing and re-encoding the same prefix tokens for each entity.
+ENRICHMENT_INSTRUCTIONS = """
+    Based on the information provided about a healthcare entity, identify:
+
+    1. Entity type (Payer, Provider, Vendor, or Integrated)
+    2. Parent company (if any)
+    3. Subsidiaries (list all that are mentioned)
+    4. Annual revenue (with B for billions or M for millions)
+    5. Key relationships with other healthcare entities
+
+    If you're uncertain about any field, use your knowledge of the healthcare industry to make an educated guess, but mark uncertain fields with an asterisk (*) at the end.
+    """
+
+# Static instruction block for combined multi-entity enrichment. Several
+# entities ride in one call, so the fixed instruction tokens are billed once
+# per call instead of once per entity. No forced tool here - the output is
+# an array, so the schema is spelled out instead.
+MULTI_ENRICHMENT_INSTRUCTIONS = """
+    You will receive a JSON array of healthcare entities, each with a name, summary, infobox, and sections. For each entity, identify:
+
+    1. Entity type (Payer, Provider, Vendor, or Integrated)
+    2. Parent company (if any)
+    3. Subsidiaries (list all that are mentioned)
+    4. Annual revenue (with B for billions or M for millions)
+    5. Key relationships with other healthcare entities
+
+    Return ONLY a JSON array with one object per input entity, in the same order, following this exact schema:
+    [
+      {
+        "name": "Entity Name",
+        "type": "Entity Type",
+        "parent": "Parent Company Name or null",
+        "revenue": "Revenue with B/M suffix or null",
+        "subsidiaries": ["Subsidiary1", "Subsidiary2"],
+        "relationships": [
+          {"target": "Company Name", "type": "relationship_type"}
+        ]
+      }
+    ]
+
+    For relationship types, use: owned_by, owns, partner, competitor, customer, vendor
+
+    If you're uncertain about any field, use your knowledge of the healthcare industry to make an educated guess, but mark uncertain fields with an asterisk (*) at the end.
+    """
+
+# Input-character budget per combined call, leaving ample headroom under the
+# model context limit
+MULTI_ENRICH_MAX_CHARS = 60000
+
+# Static instruction block for relationship inference, cacheable across
+# invocations for the same reason as ENRICHMENT_INSTRUCTIONS.
+INFERENCE_INSTRUCTIONS = """
+    You are a healthcare industry expert. Based on the information provided about multiple healthcare entities, please infer additional relationships between them that might not be explicitly stated.
+
+    For each entity, add or update the "relationships" array with any additional relationships you can infer based on industry knowledge and the data provided.
+
+    Return ONLY a JSON array of the updated entities, with no additional text.
+
+    For relationship types, use: owned_by, owns, partner, competitor, customer, vendor
+    """
+
+# Tool definition used to force structured output for entity enrichment.
+# With tool_choice pinned to this tool, Claude returns a validated dict in
+# the tool_use block instead of free text we would have to scan and repair.
+ENTITY_TOOL = {
+    "name": "emit_entity",
+    "description": "Record the structured data extracted about a healthcare entity.",
+    "input_schema": ENTITY_JSON_SCHEMA
+}
+ENTITY_TOOL_CHOICE = {"type": "tool", "name": "emit_entity"}
+
+def _entity_from_response(response):
+    """
+    Extract the structured entity dict from a tool-use response
+
+    Args:
+        response: Message returned by the Claude API
+
+    Returns:
+        dict: The entity data from the forced tool call, or parsed from text
+        as a fallback if no tool_use block is present
+    """
+    for block in response.content:
+        if block.type == "tool_use":
+            return dict(block.input)
+
+    # Fall back to text parsing if the model answered in prose
+    return _parse_llm_json(response.content[0].text)
+
+# Clients are created lazily once and reused across calls: rebuilding the
+# client per call would pay connection-pool setup each time and throw away
+# keep-alive connections between requests. Creation is guarded by a lock so
+# threaded callers (e.g. tools/batch_update.py) can't race on first use.
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+def _get_client():
+    """
+    Return the shared Anthropic client, creating it on first use
+
+    Returns:
+        anthropic.Anthropic: The shared sync client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
+    return _client
+
+def _get_async_client():
+    """
+    Return the shared AsyncAnthropic client, creating it on first use
+
+    Returns:
+        anthropic.AsyncAnthropic: The shared async client
+    """
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = anthropic.AsyncAnthropic(api_key=CLAUDE_API_KEY)
+    return _async_client
+
+# Only these Wikipedia sections carry signal for type/parent/revenue
+# extraction; everything else (References, External links, prose history of
+# products, ...) just inflates input tokens. Each kept section is also
+# truncated - the relevant facts appear early.
+RELEVANT_SECTIONS = {"history", "subsidiaries", "operations", "acquisitions", "finances", "structure", "corporate"}
+RELEVANT_INFOBOX_FIELDS = {"revenue", "parent", "subsidiaries", "industry", "type", "owner"}
+MAX_SECTION_CHARS = 1500
+
+def _filter_scraped_data(infobox, sections):
+    """
+    Keep only the infobox fields and sections relevant to enrichment
+
+    Args:
+        infobox (dict): Raw infobox data from the scraper
+        sections (dict): Raw section texts from the scraper
+
+    Returns:
+        tuple: (filtered_infobox, filtered_sections)
+    """
+    filtered_infobox = {
+        key: value for key, value in infobox.items()
+        if any(field in key.lower() for field in RELEVANT_INFOBOX_FIELDS)
+    }
+    filtered_sections = {
+        key: value[:MAX_SECTION_CHARS] for key, value in sections.items()
+        if any(name in key.lower() for name in RELEVANT_SECTIONS)
+    }
+    return filtered_infobox, filtered_sections
+
+def _cached_system(system_prompt):
+    """
+    Wrap a system prompt in a content block marked for prompt caching
+
+    Args:
+        system_prompt (str): The system prompt text
+
+    Returns:
+        list: System content blocks for the Claude API
+    """
+    return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+def _build_enrichment_content(entity_name, scraped_data):
+    """
+    Build the user content blocks for a single entity from its scraped data
+
+    The fixed instruction/schema template goes in a cached block; only the
+    per-entity scraped data is sent uncached.
+
+    Args:
+        entity_name (str): Name of the healthcare entity
+        scraped_data (dict): Basic data scraped from public sources
+
+    Returns:
+        list: User content blocks for the Claude API
+    """
+    # Prepare the data for the prompt, dropping irrelevant sections and
+    # infobox fields before they hit the token bill
+    summary = scraped_data.get("summary", "")
+    infobox, sections = _filter_scraped_data(
+        scraped_data.get("infobox", {}), scraped_data.get("sections", {})
+    )
+
+    # Format the infobox data
+    infobox_text = "\n".join([f"{key}: {value}" for key, value in infobox.items()])
+
+    # Format the sections data
+    sections_text = "\n\n".join([f"## {section}\n{content}" for section, content in sections.items()])
+
+    # Construct the per-entity data block (compact headers - the verbose
+    # form only cost input tokens)
+    entity_text = f"""Entity: {entity_name}
+
+SUMMARY:
+{summary}
+
+INFOBOX:
+{infobox_text}
+
+SECTIONS:
+{sections_text}"""
+
+    return [
+        {"type": "text", "text": ENRICHMENT_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": entity_text}
+    ]
+
+def _select_model(content):
+    """
+    Pick the model based on the size of the scraped payload
+
+    Args:
+        content (list): User content blocks from _build_enrichment_content
+
+    Returns:
+        str: Model identifier to use for this request
+    """
+    entity_text = content[-1]["text"]
+    if len(entity_text) < MODEL_ROUTING_THRESHOLD:
+        return CLAUDE_MODEL_SMALL
+    return CLAUDE_MODEL_LARGE
+
+def _parse_llm_json(response_text):
+    """
+    Parse JSON from an LLM response, repairing malformed output if needed
+
+    Tries direct parsing first (the common case), then strips markdown
+    fences/surrounding text, completes responses truncated at the max_tokens
+    limit, and finally runs the fuzzy json_repair pass that fixes trailing
+    commas, single quotes, and other malformations the LLM may emit.
+
+    Args:
+        response_text (str): Raw text returned by the LLM
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the text cannot be parsed even after repair
+    """
+    try:
+        return orjson.loads(response_text)
+    except orjson.JSONDecodeError:
+        pass
+
+    json_text = extract_json_text(response_text)
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        pass
+
+    # Completing a truncated response in-process avoids a full retry call;
+    # the warning flags that max_tokens was too small for this payload
+    if is_truncated_json(json_text):
+        logger.warning("LLM response appears truncated (truncated=True), completing unclosed JSON")
+        try:
+            return parse_partial_json(json_text)
+        except json.JSONDecodeError:
+            pass
+
+    return json.loads(repair_json(json_text))
+
+def _fill_required_fields(enriched_data):
+    """
+    Ensure the required fields are present in enriched entity data
+
+    Args:
+        enriched_data (dict): Enriched entity data to normalize in place
+
+    Returns:
+        dict: The same entity data with required fields filled in
+    """
+    required_fields = ["name", "type", "subsidiaries", "relationships"]
+    for field in required_fields:
+        if field not in enriched_data:
+            enriched_data[field] = [] if field in ["subsidiaries", "relationships"] else None
+    return enriched_data
 
 def enrich_entity_data(entity_name, scraped_data):
     """
@@ -36,133 +344,366 @@ def enrich_entity_data(entity_name, scraped_data):
         logger.error("Claude API key not found. Please set CLAUDE_API_KEY in .env file.")
         return {"error": "API key not configured", "entity_name": entity_name}
     
-    logger.info(f"Enriching data for {entity_name} using Claude API")
+    logger.info("Enriching data for %s using Claude API", entity_name)
     
     try:
-        # Remove any proxy settings from environment variables to avoid issues
-        os.environ.pop('HTTP_PROXY', None)
-        os.environ.pop('HTTPS_PROXY', None)
-        os.environ.pop('http_proxy', None)
-        os.environ.pop('https_proxy', None)
-        
-        # Initialize the Anthropic client without proxies
-        client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
-        
-        # Prepare the data for the prompt
-        summary = scraped_data.get("summary", "")
-        infobox = scraped_data.get("infobox", {})
-        sections = scraped_data.get("sections", {})
-        
-        # Format the infobox data
-        infobox_text = "\n".join([f"{key}: {value}" for key, value in infobox.items()])
-        
-        # Format the sections data
-        sections_text = "\n\n".join([f"## {section}\n{content}" for section, content in sections.items()])
-        
-        # Construct the prompt
-        prompt = f"""
-        You are a healthcare industry expert. Based on the following information about {entity_name}, please identify:
-        
-        1. Entity type (Payer, Provider, Vendor, or Integrated)
-        2. Parent company (if any)
-        3. Subsidiaries (list all that are mentioned)
-        4. Annual revenue (with B for billions or M for millions)
-        5. Key relationships with other healthcare entities
-        
-        Information about {entity_name}:
-        
-        SUMMARY:
-        {summary}
-        
-        INFOBOX DATA:
-        {infobox_text}
-        
-        ADDITIONAL SECTIONS:
-        {sections_text}
-        
-        Return ONLY a JSON object following this exact schema, with no additional text:
-        {{
-          "name": "{entity_name}",
-          "type": "Entity Type",
-          "parent": "Parent Company Name or null",
-          "revenue": "Revenue with B/M suffix or null",
-          "subsidiaries": ["Subsidiary1", "Subsidiary2"],
-          "relationships": [
-            {{"target": "Company Name", "type": "relationship_type"}}
-          ]
-        }}
-        
-        For relationship types, use: owned_by, owns, partner, competitor, customer, vendor
-        
-        If you're uncertain about any field, use your knowledge of the healthcare industry to make an educated guess, but mark uncertain fields with an asterisk (*) at the end.
-        """
-        
-        # Call the Claude API
-        response = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=2000,
-            temperature=0.2,
-            system="You are a healthcare industry expert who extracts structured information about healthcare companies. IMPORTANT: Return ONLY the raw JSON object with no additional text, explanations, or markdown formatting.",
+        client = _get_client()
+
+        # Construct the prompt (static instructions cached, entity data uncached)
+        content = _build_enrichment_content(entity_name, scraped_data)
+        model = _select_model(content)
+
+        # Check the disk cache before hitting the API
+        cache = get_llm_cache()
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key(model, ENRICHMENT_SYSTEM_PROMPT, content)
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                logger.info("Using cached enrichment for %s", entity_name)
+                return cached_data
+
+        # On an exact miss, check for a near-duplicate prompt (e.g. only the
+        # news items changed since the last run)
+        semantic_cache = get_semantic_cache()
+        entity_text = content[-1]["text"]
+        if semantic_cache:
+            cached_data = semantic_cache.get(entity_text)
+            if cached_data is not None:
+                logger.info("Using semantically cached enrichment for %s", entity_name)
+                return cached_data
+
+        # Call the Claude API with the forced entity tool, streaming the
+        # response so chunks are accumulated while tokens are still being
+        # generated instead of waiting for the full message
+        with client.messages.stream(
+            model=model,
+            max_tokens=800,
+            temperature=0,
+            system=_cached_system(ENRICHMENT_SYSTEM_PROMPT),
+            tools=[ENTITY_TOOL],
+            tool_choice=ENTITY_TOOL_CHOICE,
             messages=[
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": content}
             ]
-        )
-        
-        # Extract the JSON from the response
-        response_text = response.content[0].text
-        
-        # Sometimes Claude might wrap the JSON in markdown code blocks, so we need to extract it
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            # If Claude returns text before the JSON, try to extract just the JSON part
-            # Look for the first occurrence of '{'
-            if '{' in response_text:
-                start_idx = response_text.find('{')
-                # Find the matching closing brace
-                brace_count = 0
-                end_idx = -1
-                for i in range(start_idx, len(response_text)):
-                    if response_text[i] == '{':
-                        brace_count += 1
-                    elif response_text[i] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            end_idx = i + 1
-                            break
-                
-                if end_idx > start_idx:
-                    json_text = response_text[start_idx:end_idx].strip()
-                else:
-                    json_text = response_text.strip()
-            else:
-                json_text = response_text.strip()
-        
-        # Parse the JSON
-        enriched_data = json.loads(json_text)
-        
+        ) as stream:
+            response = stream.get_final_message()
+
+        # The forced tool call already returns a validated dict
+        enriched_data = _entity_from_response(response)
+
         # Validate the required fields
-        required_fields = ["name", "type", "subsidiaries", "relationships"]
-        for field in required_fields:
-            if field not in enriched_data:
-                enriched_data[field] = [] if field in ["subsidiaries", "relationships"] else None
-        
-        logger.info(f"Successfully enriched data for {entity_name}")
+        _fill_required_fields(enriched_data)
+
+        # Store the result for future calls on unchanged or similar input
+        if cache and cache_key:
+            cache.set(cache_key, enriched_data)
+        if semantic_cache:
+            semantic_cache.add(entity_text, enriched_data)
+
+        logger.info("Successfully enriched data for %s", entity_name)
         return enriched_data
         
     except anthropic.APIError as e:
-        logger.error(f"Claude API error for {entity_name}: {str(e)}")
+        logger.error("Claude API error for %s: %s", entity_name, e)
         return {"error": f"Claude API error: {str(e)}", "entity_name": entity_name}
     except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error for {entity_name}: {str(e)}")
-        logger.error(f"Response text: {response_text}")
+        logger.error("JSON parsing error for %s: %s", entity_name, e)
         return {"error": f"JSON parsing error: {str(e)}", "entity_name": entity_name}
     except Exception as e:
-        logger.error(f"Unexpected error enriching data for {entity_name}: {str(e)}")
+        logger.error("Unexpected error enriching data for %s: %s", entity_name, e)
         return {"error": str(e), "entity_name": entity_name}
 
+async def enrich_entity_data_async(entity_name, scraped_data):
+    """
+    Enrich entity data using the Claude API (async variant)
+
+    Awaiting the shared AsyncAnthropic client lets callers overlap many
+    enrichment requests with asyncio.gather instead of paying one network
+    round-trip per entity sequentially.
+
+    Args:
+        entity_name (str): Name of the healthcare entity
+        scraped_data (dict): Basic data scraped from public sources
+
+    Returns:
+        dict: Enriched entity data with relationships and subsidiaries
+    """
+    if not CLAUDE_API_KEY:
+        logger.error("Claude API key not found. Please set CLAUDE_API_KEY in .env file.")
+        return {"error": "API key not configured", "entity_name": entity_name}
+
+    logger.info("Enriching data for %s using Claude API", entity_name)
+
+    try:
+        client = _get_async_client()
+
+        # Construct the prompt (static instructions cached, entity data uncached)
+        content = _build_enrichment_content(entity_name, scraped_data)
+        model = _select_model(content)
+
+        # Check the disk cache before hitting the API
+        cache = get_llm_cache()
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key(model, ENRICHMENT_SYSTEM_PROMPT, content)
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                logger.info("Using cached enrichment for %s", entity_name)
+                return cached_data
+
+        # On an exact miss, check for a near-duplicate prompt (e.g. only the
+        # news items changed since the last run)
+        semantic_cache = get_semantic_cache()
+        entity_text = content[-1]["text"]
+        if semantic_cache:
+            cached_data = semantic_cache.get(entity_text)
+            if cached_data is not None:
+                logger.info("Using semantically cached enrichment for %s", entity_name)
+                return cached_data
+
+        # Call the Claude API with the forced entity tool, streaming the
+        # response so chunks are accumulated while tokens are still being
+        # generated instead of waiting for the full message
+        async with client.messages.stream(
+            model=model,
+            max_tokens=800,
+            temperature=0,
+            system=_cached_system(ENRICHMENT_SYSTEM_PROMPT),
+            tools=[ENTITY_TOOL],
+            tool_choice=ENTITY_TOOL_CHOICE,
+            messages=[
+                {"role": "user", "content": content}
+            ]
+        ) as stream:
+            response = await stream.get_final_message()
+
+        # The forced tool call already returns a validated dict
+        enriched_data = _entity_from_response(response)
+
+        # Validate the required fields
+        _fill_required_fields(enriched_data)
+
+        # Store the result for future calls on unchanged or similar input
+        if cache and cache_key:
+            cache.set(cache_key, enriched_data)
+        if semantic_cache:
+            semantic_cache.add(entity_text, enriched_data)
+
+        logger.info("Successfully enriched data for %s", entity_name)
+        return enriched_data
+
+    except anthropic.APIError as e:
+        logger.error("Claude API error for %s: %s", entity_name, e)
+        return {"error": f"Claude API error: {str(e)}", "entity_name": entity_name}
+    except json.JSONDecodeError as e:
+        logger.error("JSON parsing error for %s: %s", entity_name, e)
+        return {"error": f"JSON parsing error: {str(e)}", "entity_name": entity_name}
+    except Exception as e:
+        logger.error("Unexpected error enriching data for %s: %s", entity_name, e)
+        return {"error": str(e), "entity_name": entity_name}
+
+def enrich_entity_data_multi(entities_with_data, max_chars=MULTI_ENRICH_MAX_CHARS):
+    """
+    Enrich several entities per LLM call instead of one call each
+
+    Packs entities into combined requests under an input budget, so fixed
+    instruction tokens and HTTPS round-trips are paid once per chunk rather
+    than once per entity. Entities whose combined result can't be parsed or
+    matched fall back to individual enrichment calls.
+
+    Args:
+        entities_with_data (list): List of (entity_name, scraped_data) tuples
+        max_chars (int): Maximum input characters per combined call
+
+    Returns:
+        dict: Mapping of entity name to enriched data (or an error dict)
+    """
+    if not CLAUDE_API_KEY:
+        logger.error("Claude API key not found. Please set CLAUDE_API_KEY in .env file.")
+        return {name: {"error": "API key not configured", "entity_name": name}
+                for name, _ in entities_with_data}
+
+    if not entities_with_data:
+        return {}
+
+    logger.info("Enriching %s entities in combined calls", len(entities_with_data))
+
+    # Pack entities into chunks under the input budget
+    chunks = []
+    current_chunk = []
+    current_size = 0
+    for entity_name, scraped_data in entities_with_data:
+        infobox, sections = _filter_scraped_data(
+            scraped_data.get("infobox", {}), scraped_data.get("sections", {})
+        )
+        payload = orjson.dumps({
+            "name": entity_name,
+            "summary": scraped_data.get("summary", ""),
+            "infobox": infobox,
+            "sections": sections
+        }).decode()
+
+        if current_chunk and current_size + len(payload) > max_chars:
+            chunks.append(current_chunk)
+            current_chunk = []
+            current_size = 0
+        current_chunk.append((entity_name, scraped_data, payload))
+        current_size += len(payload)
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    client = _get_client()
+    results = {}
+
+    for chunk in chunks:
+        entities_json = "[" + ",".join(payload for _, _, payload in chunk) + "]"
+        content = [
+            {"type": "text", "text": MULTI_ENRICHMENT_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": entities_json}
+        ]
+
+        try:
+            response_text = ""
+            with client.messages.stream(
+                model=CLAUDE_MODEL_LARGE,
+                max_tokens=min(800 * len(chunk), 8000),
+                temperature=0,
+                system=_cached_system(ENRICHMENT_SYSTEM_PROMPT),
+                messages=[
+                    {"role": "user", "content": content}
+                ]
+            ) as stream:
+                for text in stream.text_stream:
+                    response_text += text
+
+            parsed = _parse_llm_json(response_text)
+            if not isinstance(parsed, list):
+                raise ValueError("Expected a JSON array of entities")
+
+            # Match results to inputs by name, falling back to position
+            by_name = {item.get("name"): item for item in parsed if isinstance(item, dict)}
+            for i, (entity_name, _, _) in enumerate(chunk):
+                item = by_name.get(entity_name)
+                if item is None and i < len(parsed) and isinstance(parsed[i], dict):
+                    item = parsed[i]
+                if item is not None:
+                    results[entity_name] = _fill_required_fields(item)
+
+        except Exception as e:
+            logger.error("Combined enrichment call failed, falling back to single calls: %s", e)
+
+        # Fall back to individual calls for anything the chunk didn't cover
+        for entity_name, scraped_data, _ in chunk:
+            if entity_name not in results:
+                logger.info("Falling back to single-entity enrichment for %s", entity_name)
+                results[entity_name] = enrich_entity_data(entity_name, scraped_data)
+
+    logger.info("Successfully enriched %s entities in %s combined calls", len(results), len(chunks))
+    return results
+
+def enrich_entity_data_batch(entities_with_data, poll_interval=5, max_poll_interval=60):
+    """
+    Enrich multiple entities in a single Message Batches request
+
+    Submitting one batch instead of N individual calls amortizes the HTTP and
+    queueing overhead and runs on Anthropic's discounted batch lane (50% of
+    the per-token cost of synchronous calls).
+
+    Args:
+        entities_with_data (list): List of (entity_name, scraped_data) tuples
+        poll_interval (int): Initial polling interval in seconds
+        max_poll_interval (int): Maximum polling interval in seconds
+
+    Returns:
+        dict: Mapping of entity name to enriched data (or an error dict)
+    """
+    if not CLAUDE_API_KEY:
+        logger.error("Claude API key not found. Please set CLAUDE_API_KEY in .env file.")
+        return {name: {"error": "API key not configured", "entity_name": name}
+                for name, _ in entities_with_data}
+
+    if not entities_with_data:
+        return {}
+
+    logger.info("Enriching %s entities using the Message Batches API", len(entities_with_data))
+
+    try:
+        client = _get_client()
+
+        # Build one request per entity. Entity names can contain characters
+        # that are invalid in a custom_id, so use a positional id and map it
+        # back to the entity name when reading results.
+        custom_id_to_name = {}
+        batch_requests = []
+        for i, (entity_name, scraped_data) in enumerate(entities_with_data):
+            custom_id = f"entity-{i}"
+            custom_id_to_name[custom_id] = entity_name
+            content = _build_enrichment_content(entity_name, scraped_data)
+            batch_requests.append({
+                "custom_id": custom_id,
+                "params": {
+                    "model": _select_model(content),
+                    "max_tokens": 800,
+                    "temperature": 0,
+                    "system": _cached_system(ENRICHMENT_SYSTEM_PROMPT),
+                    "tools": [ENTITY_TOOL],
+                    "tool_choice": ENTITY_TOOL_CHOICE,
+                    "messages": [
+                        {"role": "user", "content": content}
+                    ]
+                }
+            })
+
+        # Submit the batch
+        batch = client.messages.batches.create(requests=batch_requests)
+        logger.info("Submitted batch %s with %s requests", batch.id, len(batch_requests))
+
+        # Poll for completion with exponential backoff
+        interval = poll_interval
+        while batch.processing_status != "ended":
+            time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+            batch = client.messages.batches.retrieve(batch.id)
+            logger.info("Batch %s status: %s", batch.id, batch.processing_status)
+
+        # Stream the results and map them back to entities
+        results = {}
+        for result in client.messages.batches.results(batch.id):
+            entity_name = custom_id_to_name.get(result.custom_id)
+            if entity_name is None:
+                logger.warning("Unknown custom_id in batch results: %s", result.custom_id)
+                continue
+
+            if result.result.type != "succeeded":
+                logger.error("Batch request for %s ended with status: %s", entity_name, result.result.type)
+                results[entity_name] = {"error": f"Batch request {result.result.type}", "entity_name": entity_name}
+                continue
+
+            try:
+                enriched_data = _entity_from_response(result.result.message)
+                results[entity_name] = _fill_required_fields(enriched_data)
+            except json.JSONDecodeError as e:
+                logger.error("JSON parsing error for %s: %s", entity_name, e)
+                results[entity_name] = {"error": f"JSON parsing error: {str(e)}", "entity_name": entity_name}
+
+        # Flag any entities the batch didn't return a result for
+        for entity_name in custom_id_to_name.values():
+            if entity_name not in results:
+                results[entity_name] = {"error": "No result returned from batch", "entity_name": entity_name}
+
+        logger.info("Successfully enriched %s entities from batch %s", len(results), batch.id)
+        return results
+
+    except anthropic.APIError as e:
+        logger.error("Claude API error during batch enrichment: %s", e)
+        return {name: {"error": f"Claude API error: {str(e)}", "entity_name": name}
+                for name, _ in entities_with_data}
+    except Exception as e:
+        logger.error("Unexpected error during batch enrichment: %s", e)
+        return {name: {"error": str(e), "entity_name": name}
+                for name, _ in entities_with_data}
+
 def infer_relationships(entities):
     """
     Infer relationships between multiple healthcare entities
@@ -177,93 +718,66 @@ def infer_relationships(entities):
         logger.error("Claude API key not found. Please set CLAUDE_API_KEY in .env file.")
         return entities
     
-    logger.info(f"Inferring relationships between {len(entities)} entities")
+    logger.info("Inferring relationships between %s entities", len(entities))
     
     try:
-        # Remove any proxy settings from environment variables to avoid issues
-        os.environ.pop('HTTP_PROXY', None)
-        os.environ.pop('HTTPS_PROXY', None)
-        os.environ.pop('http_proxy', None)
-        os.environ.pop('https_proxy', None)
-        
-        # Initialize the Anthropic client without proxies
-        client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
-        
-        # Format the entities data
-        entities_json = json.dumps(entities, indent=2)
-        
-        # Construct the prompt
-        prompt = f"""
-        You are a healthcare industry expert. Based on the following information about multiple healthcare entities, please infer additional relationships between them that might not be explicitly stated.
-        
-        Entities:
-        {entities_json}
+        client = _get_client()
         
-        For each entity, add or update the "relationships" array with any additional relationships you can infer based on industry knowledge and the data provided.
-        
-        Return ONLY a JSON array of the updated entities, with no additional text.
-        
-        For relationship types, use: owned_by, owns, partner, competitor, customer, vendor
-        """
-        
-        # Call the Claude API
-        response = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=4000,
-            temperature=0.2,
-            system="You are a healthcare industry expert who infers relationships between healthcare companies. IMPORTANT: Return ONLY the raw JSON array with no additional text, explanations, or markdown formatting.",
+        # Format the entities data (compact form: the LLM doesn't need
+        # indentation and it would cost input tokens)
+        entities_json = orjson.dumps(entities).decode()
+
+        # Construct the prompt (static instructions cached, entity data uncached)
+        content = [
+            {"type": "text", "text": INFERENCE_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": f"Entities:\n{entities_json}"}
+        ]
+
+        # Check the disk cache before hitting the API
+        cache = get_llm_cache()
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key(CLAUDE_MODEL_LARGE, INFERENCE_INSTRUCTIONS, content)
+            cached_entities = cache.get(cache_key)
+            if cached_entities is not None:
+                logger.info("Using cached relationship inference")
+                return cached_entities
+
+        # Call the Claude API, streaming the response. The model echoes the
+        # whole updated entity array, so the token budget scales with the
+        # serialized input (~4 chars per token, with headroom for the added
+        # relationships) rather than a flat per-entity allowance
+        response_text = ""
+        with client.messages.stream(
+            model=CLAUDE_MODEL_LARGE,
+            max_tokens=min(512 + len(entities_json) // 3, 8000),
+            temperature=0,
+            system=_cached_system("You are a healthcare industry expert who infers relationships between healthcare companies. IMPORTANT: Return ONLY the raw JSON array with no additional text, explanations, or markdown formatting."),
             messages=[
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": content}
             ]
-        )
-        
-        # Extract the JSON from the response
-        response_text = response.content[0].text
-        
-        # Sometimes Claude might wrap the JSON in markdown code blocks, so we need to extract it
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            # If Claude returns text before the JSON, try to extract just the JSON part
-            # Look for the first occurrence of '['
-            if '[' in response_text:
-                start_idx = response_text.find('[')
-                # Find the matching closing bracket
-                bracket_count = 0
-                end_idx = -1
-                for i in range(start_idx, len(response_text)):
-                    if response_text[i] == '[':
-                        bracket_count += 1
-                    elif response_text[i] == ']':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            end_idx = i + 1
-                            break
-                
-                if end_idx > start_idx:
-                    json_text = response_text[start_idx:end_idx].strip()
-                else:
-                    json_text = response_text.strip()
-            else:
-                json_text = response_text.strip()
-        
-        # Parse the JSON
-        updated_entities = json.loads(json_text)
-        
-        logger.info(f"Successfully inferred relationships between {len(entities)} entities")
+        ) as stream:
+            for text in stream.text_stream:
+                response_text += text
+
+        updated_entities = _parse_llm_json(response_text)
+
+        # Store the result for future calls on unchanged input
+        if cache and cache_key:
+            cache.set(cache_key, updated_entities)
+
+        logger.info("Successfully inferred relationships between %s entities", len(entities))
         return updated_entities
         
     except anthropic.APIError as e:
-        logger.error(f"Claude API error inferring relationships: {str(e)}")
+        logger.error("Claude API error inferring relationships: %s", e)
         return entities
     except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error inferring relationships: {str(e)}")
-        logger.error(f"Response text: {response_text}")
+        logger.error("JSON parsing error inferring relationships: %s", e)
+        logger.error("Response text: %s", response_text)
         return entities
     except Exception as e:
-        logger.error(f"Unexpected error inferring relationships: {str(e)}")
+        logger.error("Unexpected error inferring relationships: %s", e)
         return entities
 
 # For testing
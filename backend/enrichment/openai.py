@@ -6,13 +6,19 @@ This is provided as a fallback option if Claude is not available.
 """
 
 import os
+import io
 import json
+import time
+import threading
+import orjson
 import openai
+from json_repair import repair_json
 from dotenv import load_dotenv
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from backend.enrichment._json_extract import extract_json_text, is_truncated_json, parse_partial_json
+from backend.enrichment.schema import ENTITY_JSON_SCHEMA
+
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -20,7 +26,174 @@ load_dotenv()
 
 # Constants
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-OPENAI_MODEL = "gpt-4"  # Use the latest available model
+# Model routing: small Wikipedia stubs produce identical JSON from the small
+# model in a fraction of the time and cost, so only payloads above the
+# threshold go to the large model.
+OPENAI_MODEL_SMALL = os.getenv('OPENAI_MODEL_SMALL', 'gpt-4o-mini')
+OPENAI_MODEL_LARGE = os.getenv('OPENAI_MODEL_LARGE', 'gpt-4o')
+MODEL_ROUTING_THRESHOLD = 3000  # characters of scraped payload
+
+# System prompt used for entity enrichment (single and batch)
+ENRICHMENT_SYSTEM_PROMPT = "You are a healthcare industry expert who extracts structured information about healthcare companies and returns it in valid JSON format only."
+
+# Structured-output format for entity enrichment. With strict json_schema
+# mode the API returns machine-validated JSON, so no text-scan fallback or
+# schema echo in the output is needed.
+ENTITY_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "entity",
+        "schema": ENTITY_JSON_SCHEMA,
+        "strict": True
+    }
+}
+
+# Only these Wikipedia sections carry signal for type/parent/revenue
+# extraction; everything else (References, External links, prose history of
+# products, ...) just inflates input tokens. Each kept section is also
+# truncated - the relevant facts appear early.
+RELEVANT_SECTIONS = {"history", "subsidiaries", "operations", "acquisitions", "finances", "structure", "corporate"}
+RELEVANT_INFOBOX_FIELDS = {"revenue", "parent", "subsidiaries", "industry", "type", "owner"}
+MAX_SECTION_CHARS = 1500
+
+def _filter_scraped_data(infobox, sections):
+    """
+    Keep only the infobox fields and sections relevant to enrichment
+
+    Args:
+        infobox (dict): Raw infobox data from the scraper
+        sections (dict): Raw section texts from the scraper
+
+    Returns:
+        tuple: (filtered_infobox, filtered_sections)
+    """
+    filtered_infobox = {
+        key: value for key, value in infobox.items()
+        if any(field in key.lower() for field in RELEVANT_INFOBOX_FIELDS)
+    }
+    filtered_sections = {
+        key: value[:MAX_SECTION_CHARS] for key, value in sections.items()
+        if any(name in key.lower() for name in RELEVANT_SECTIONS)
+    }
+    return filtered_infobox, filtered_sections
+
+def _build_enrichment_prompt(entity_name, scraped_data):
+    """
+    Build the enrichment prompt for a single entity from its scraped data
+
+    Args:
+        entity_name (str): Name of the healthcare entity
+        scraped_data (dict): Basic data scraped from public sources
+
+    Returns:
+        str: Prompt text for the OpenAI API
+    """
+    # Prepare the data for the prompt, dropping irrelevant sections and
+    # infobox fields before they hit the token bill
+    summary = scraped_data.get("summary", "")
+    infobox, sections = _filter_scraped_data(
+        scraped_data.get("infobox", {}), scraped_data.get("sections", {})
+    )
+
+    # Format the infobox data
+    infobox_text = "\n".join([f"{key}: {value}" for key, value in infobox.items()])
+
+    # Format the sections data
+    sections_text = "\n\n".join([f"## {section}\n{content}" for section, content in sections.items()])
+
+    # Construct the prompt. The schema itself lives in the structured-output
+    # response format, so repeating it here would only cost input tokens.
+    prompt = f"""Based on the following information about {entity_name}, identify:
+
+1. Entity type (Payer, Provider, Vendor, or Integrated)
+2. Parent company (if any)
+3. Subsidiaries (list all that are mentioned)
+4. Annual revenue (with B for billions or M for millions)
+5. Key relationships with other healthcare entities
+
+If you're uncertain about any field, use your knowledge of the healthcare industry to make an educated guess, but mark uncertain fields with an asterisk (*) at the end.
+
+Entity: {entity_name}
+
+SUMMARY:
+{summary}
+
+INFOBOX:
+{infobox_text}
+
+SECTIONS:
+{sections_text}"""
+    return prompt
+
+def _select_model(prompt):
+    """
+    Pick the model based on the size of the scraped payload
+
+    Args:
+        prompt (str): User prompt from _build_enrichment_prompt
+
+    Returns:
+        str: Model identifier to use for this request
+    """
+    if len(prompt) < MODEL_ROUTING_THRESHOLD:
+        return OPENAI_MODEL_SMALL
+    return OPENAI_MODEL_LARGE
+
+def _parse_llm_json(response_text):
+    """
+    Parse JSON from an LLM response, repairing malformed output if needed
+
+    Tries direct parsing first (the common case), then strips markdown
+    fences, completes responses truncated at the max_tokens limit, and
+    finally runs the fuzzy json_repair pass that fixes trailing commas,
+    single quotes, and other malformations the LLM may emit.
+
+    Args:
+        response_text (str): Raw text returned by the LLM
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the text cannot be parsed even after repair
+    """
+    try:
+        return orjson.loads(response_text)
+    except orjson.JSONDecodeError:
+        pass
+
+    json_text = extract_json_text(response_text)
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        pass
+
+    # Completing a truncated response in-process avoids a full retry call;
+    # the warning flags that max_tokens was too small for this payload
+    if is_truncated_json(json_text):
+        logger.warning("LLM response appears truncated (truncated=True), completing unclosed JSON")
+        try:
+            return parse_partial_json(json_text)
+        except json.JSONDecodeError:
+            pass
+
+    return json.loads(repair_json(json_text))
+
+def _fill_required_fields(enriched_data):
+    """
+    Ensure the required fields are present in enriched entity data
+
+    Args:
+        enriched_data (dict): Enriched entity data to normalize in place
+
+    Returns:
+        dict: The same entity data with required fields filled in
+    """
+    required_fields = ["name", "type", "subsidiaries", "relationships"]
+    for field in required_fields:
+        if field not in enriched_data:
+            enriched_data[field] = [] if field in ["subsidiaries", "relationships"] else None
+    return enriched_data
 
 def enrich_entity_data(entity_name, scraped_data):
     """
@@ -37,105 +210,263 @@ def enrich_entity_data(entity_name, scraped_data):
         logger.error("OpenAI API key not found. Please set OPENAI_API_KEY in .env file.")
         return {"error": "API key not configured", "entity_name": entity_name}
     
-    logger.info(f"Enriching data for {entity_name} using OpenAI API")
+    logger.info("Enriching data for %s using OpenAI API", entity_name)
     
     try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Prepare the data for the prompt
-        summary = scraped_data.get("summary", "")
-        infobox = scraped_data.get("infobox", {})
-        sections = scraped_data.get("sections", {})
-        
-        # Format the infobox data
-        infobox_text = "\n".join([f"{key}: {value}" for key, value in infobox.items()])
-        
-        # Format the sections data
-        sections_text = "\n\n".join([f"## {section}\n{content}" for section, content in sections.items()])
-        
+        client = _get_client()
+
         # Construct the prompt
-        prompt = f"""
-        You are a healthcare industry expert. Based on the following information about {entity_name}, please identify:
-        
-        1. Entity type (Payer, Provider, Vendor, or Integrated)
-        2. Parent company (if any)
-        3. Subsidiaries (list all that are mentioned)
-        4. Annual revenue (with B for billions or M for millions)
-        5. Key relationships with other healthcare entities
-        
-        Information about {entity_name}:
-        
-        SUMMARY:
-        {summary}
-        
-        INFOBOX DATA:
-        {infobox_text}
-        
-        ADDITIONAL SECTIONS:
-        {sections_text}
-        
-        Return ONLY a JSON object following this exact schema, with no additional text:
-        {{
-          "name": "{entity_name}",
-          "type": "Entity Type",
-          "parent": "Parent Company Name or null",
-          "revenue": "Revenue with B/M suffix or null",
-          "subsidiaries": ["Subsidiary1", "Subsidiary2"],
-          "relationships": [
-            {{"target": "Company Name", "type": "relationship_type"}}
-          ]
-        }}
-        
-        For relationship types, use: owned_by, owns, partner, competitor, customer, vendor
-        
-        If you're uncertain about any field, use your knowledge of the healthcare industry to make an educated guess, but mark uncertain fields with an asterisk (*) at the end.
-        """
-        
+        prompt = _build_enrichment_prompt(entity_name, scraped_data)
+
         # Call the OpenAI API
         response = client.chat.completions.create(
-            model=OPENAI_MODEL,
+            model=_select_model(prompt),
             messages=[
-                {"role": "system", "content": "You are a healthcare industry expert who extracts structured information about healthcare companies and returns it in valid JSON format only."},
+                {"role": "system", "content": ENRICHMENT_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.2,
-            max_tokens=2000
+            temperature=0,
+            max_tokens=800,
+            response_format=ENTITY_RESPONSE_FORMAT
         )
-        
-        # Extract the JSON from the response
-        response_text = response.choices[0].message.content
-        
-        # Sometimes OpenAI might wrap the JSON in markdown code blocks, so we need to extract it
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            json_text = response_text.strip()
-        
-        # Parse the JSON
-        enriched_data = json.loads(json_text)
-        
+
+        # Structured-output mode guarantees schema-valid JSON
+        enriched_data = orjson.loads(response.choices[0].message.content)
+
         # Validate the required fields
-        required_fields = ["name", "type", "subsidiaries", "relationships"]
-        for field in required_fields:
-            if field not in enriched_data:
-                enriched_data[field] = [] if field in ["subsidiaries", "relationships"] else None
-        
-        logger.info(f"Successfully enriched data for {entity_name}")
+        _fill_required_fields(enriched_data)
+
+        logger.info("Successfully enriched data for %s", entity_name)
         return enriched_data
         
     except openai.OpenAIError as e:
-        logger.error(f"OpenAI API error for {entity_name}: {str(e)}")
+        logger.error("OpenAI API error for %s: %s", entity_name, e)
+        return {"error": f"OpenAI API error: {str(e)}", "entity_name": entity_name}
+    except json.JSONDecodeError as e:
+        logger.error("JSON parsing error for %s: %s", entity_name, e)
+        return {"error": f"JSON parsing error: {str(e)}", "entity_name": entity_name}
+    except Exception as e:
+        logger.error("Unexpected error enriching data for %s: %s", entity_name, e)
+        return {"error": str(e), "entity_name": entity_name}
+
+# Clients are created lazily once and reused across calls: rebuilding the
+# client per call would pay connection-pool setup each time and throw away
+# keep-alive connections between requests. Creation is guarded by a lock so
+# threaded callers (e.g. tools/batch_update.py) can't race on first use.
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+def _get_client():
+    """
+    Return the shared OpenAI client, creating it on first use
+
+    Returns:
+        openai.OpenAI: The shared sync client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    return _client
+
+def _get_async_client():
+    """
+    Return the shared AsyncOpenAI client, creating it on first use
+
+    Returns:
+        openai.AsyncOpenAI: The shared async client
+    """
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+    return _async_client
+
+async def enrich_entity_data_async(entity_name, scraped_data):
+    """
+    Enrich entity data using the OpenAI API (async variant)
+
+    Awaiting the shared AsyncOpenAI client lets callers overlap many
+    enrichment requests with asyncio.gather instead of paying one network
+    round-trip per entity sequentially.
+
+    Args:
+        entity_name (str): Name of the healthcare entity
+        scraped_data (dict): Basic data scraped from public sources
+
+    Returns:
+        dict: Enriched entity data with relationships and subsidiaries
+    """
+    if not OPENAI_API_KEY:
+        logger.error("OpenAI API key not found. Please set OPENAI_API_KEY in .env file.")
+        return {"error": "API key not configured", "entity_name": entity_name}
+
+    logger.info("Enriching data for %s using OpenAI API", entity_name)
+
+    try:
+        client = _get_async_client()
+
+        # Construct the prompt
+        prompt = _build_enrichment_prompt(entity_name, scraped_data)
+
+        # Call the OpenAI API
+        response = await client.chat.completions.create(
+            model=_select_model(prompt),
+            messages=[
+                {"role": "system", "content": ENRICHMENT_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0,
+            max_tokens=800,
+            response_format=ENTITY_RESPONSE_FORMAT
+        )
+
+        # Structured-output mode guarantees schema-valid JSON
+        enriched_data = orjson.loads(response.choices[0].message.content)
+
+        # Validate the required fields
+        _fill_required_fields(enriched_data)
+
+        logger.info("Successfully enriched data for %s", entity_name)
+        return enriched_data
+
+    except openai.OpenAIError as e:
+        logger.error("OpenAI API error for %s: %s", entity_name, e)
         return {"error": f"OpenAI API error: {str(e)}", "entity_name": entity_name}
     except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error for {entity_name}: {str(e)}")
-        logger.error(f"Response text: {response_text}")
+        logger.error("JSON parsing error for %s: %s", entity_name, e)
         return {"error": f"JSON parsing error: {str(e)}", "entity_name": entity_name}
     except Exception as e:
-        logger.error(f"Unexpected error enriching data for {entity_name}: {str(e)}")
+        logger.error("Unexpected error enriching data for %s: %s", entity_name, e)
         return {"error": str(e), "entity_name": entity_name}
 
+def enrich_entity_data_batch(entities_with_data, poll_interval=5, max_poll_interval=60):
+    """
+    Enrich multiple entities in a single OpenAI Batch API request
+
+    Uploads a JSONL file of chat completion requests and submits it to the
+    /v1/batches endpoint, which runs at 50% of the synchronous per-token cost
+    and avoids N separate round-trips.
+
+    Args:
+        entities_with_data (list): List of (entity_name, scraped_data) tuples
+        poll_interval (int): Initial polling interval in seconds
+        max_poll_interval (int): Maximum polling interval in seconds
+
+    Returns:
+        dict: Mapping of entity name to enriched data (or an error dict)
+    """
+    if not OPENAI_API_KEY:
+        logger.error("OpenAI API key not found. Please set OPENAI_API_KEY in .env file.")
+        return {name: {"error": "API key not configured", "entity_name": name}
+                for name, _ in entities_with_data}
+
+    if not entities_with_data:
+        return {}
+
+    logger.info("Enriching %s entities using the OpenAI Batch API", len(entities_with_data))
+
+    try:
+        client = _get_client()
+
+        # Build one JSONL line per entity. Entity names can contain characters
+        # that are awkward in a custom_id, so use a positional id and map it
+        # back to the entity name when reading results.
+        custom_id_to_name = {}
+        jsonl_lines = []
+        for i, (entity_name, scraped_data) in enumerate(entities_with_data):
+            custom_id = f"entity-{i}"
+            custom_id_to_name[custom_id] = entity_name
+            prompt = _build_enrichment_prompt(entity_name, scraped_data)
+            jsonl_lines.append(orjson.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": _select_model(prompt),
+                    "messages": [
+                        {"role": "system", "content": ENRICHMENT_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0,
+                    "max_tokens": 800,
+                    "response_format": ENTITY_RESPONSE_FORMAT
+                }
+            }).decode())
+
+        # Upload the batch input file
+        batch_file = client.files.create(
+            file=("healthmap_batch.jsonl", io.BytesIO("\n".join(jsonl_lines).encode("utf-8"))),
+            purpose="batch"
+        )
+
+        # Submit the batch
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("Submitted batch %s with %s requests", batch.id, len(jsonl_lines))
+
+        # Poll for completion with exponential backoff
+        interval = poll_interval
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            logger.info("Batch %s status: %s", batch.id, batch.status)
+
+        if batch.status != "completed":
+            logger.error("Batch %s ended with status: %s", batch.id, batch.status)
+            return {name: {"error": f"Batch ended with status: {batch.status}", "entity_name": name}
+                    for name, _ in entities_with_data}
+
+        # Download the results and map them back to entities
+        results = {}
+        output = client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+
+            result = orjson.loads(line)
+            entity_name = custom_id_to_name.get(result.get("custom_id"))
+            if entity_name is None:
+                logger.warning("Unknown custom_id in batch results: %s", result.get('custom_id'))
+                continue
+
+            if result.get("error"):
+                logger.error("Batch request for %s failed: %s", entity_name, result['error'])
+                results[entity_name] = {"error": str(result["error"]), "entity_name": entity_name}
+                continue
+
+            response_text = result["response"]["body"]["choices"][0]["message"]["content"]
+            try:
+                enriched_data = orjson.loads(response_text)
+                results[entity_name] = _fill_required_fields(enriched_data)
+            except json.JSONDecodeError as e:
+                logger.error("JSON parsing error for %s: %s", entity_name, e)
+                results[entity_name] = {"error": f"JSON parsing error: {str(e)}", "entity_name": entity_name}
+
+        # Flag any entities the batch didn't return a result for
+        for entity_name in custom_id_to_name.values():
+            if entity_name not in results:
+                results[entity_name] = {"error": "No result returned from batch", "entity_name": entity_name}
+
+        logger.info("Successfully enriched %s entities from batch %s", len(results), batch.id)
+        return results
+
+    except openai.OpenAIError as e:
+        logger.error("OpenAI API error during batch enrichment: %s", e)
+        return {name: {"error": f"OpenAI API error: {str(e)}", "entity_name": name}
+                for name, _ in entities_with_data}
+    except Exception as e:
+        logger.error("Unexpected error during batch enrichment: %s", e)
+        return {name: {"error": str(e), "entity_name": name}
+                for name, _ in entities_with_data}
+
 def infer_relationships(entities):
     """
     Infer relationships between multiple healthcare entities
@@ -150,13 +481,14 @@ def infer_relationships(entities):
         logger.error("OpenAI API key not found. Please set OPENAI_API_KEY in .env file.")
         return entities
     
-    logger.info(f"Inferring relationships between {len(entities)} entities")
+    logger.info("Inferring relationships between %s entities", len(entities))
     
     try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        client = _get_client()
         
-        # Format the entities data
-        entities_json = json.dumps(entities, indent=2)
+        # Format the entities data (compact form: the LLM doesn't need
+        # indentation and it would cost input tokens)
+        entities_json = orjson.dumps(entities).decode()
         
         # Construct the prompt
         prompt = f"""
@@ -174,41 +506,34 @@ def infer_relationships(entities):
         
         # Call the OpenAI API
         response = client.chat.completions.create(
-            model=OPENAI_MODEL,
+            model=OPENAI_MODEL_LARGE,
             messages=[
                 {"role": "system", "content": "You are a healthcare industry expert who infers relationships between healthcare companies and returns the updated data in valid JSON format only."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.2,
-            max_tokens=4000
+            temperature=0,
+            # The response echoes the whole updated entity array, so the
+            # budget scales with the serialized input (~4 chars per token,
+            # with headroom for the added relationships)
+            max_tokens=min(512 + len(entities_json) // 3, 8000)
         )
         
         # Extract the JSON from the response
         response_text = response.choices[0].message.content
+        updated_entities = _parse_llm_json(response_text)
         
-        # Sometimes OpenAI might wrap the JSON in markdown code blocks, so we need to extract it
-        if "```json" in response_text:
-            json_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_text = response_text.split("```")[1].strip()
-        else:
-            json_text = response_text.strip()
-        
-        # Parse the JSON
-        updated_entities = json.loads(json_text)
-        
-        logger.info(f"Successfully inferred relationships between {len(entities)} entities")
+        logger.info("Successfully inferred relationships between %s entities", len(entities))
         return updated_entities
         
     except openai.OpenAIError as e:
-        logger.error(f"OpenAI API error inferring relationships: {str(e)}")
+        logger.error("OpenAI API error inferring relationships: %s", e)
         return entities
     except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error inferring relationships: {str(e)}")
-        logger.error(f"Response text: {response_text}")
+        logger.error("JSON parsing error inferring relationships: %s", e)
+        logger.error("Response text: %s", response_text)
         return entities
     except Exception as e:
-        logger.error(f"Unexpected error inferring relationships: {str(e)}")
+        logger.error("Unexpected error inferring relationships: %s", e)
         return entities
 
 # For testing
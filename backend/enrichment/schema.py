@@ -0,0 +1,34 @@
+"""
+Entity schema module for HealthMap.
+
+This module defines the structured-output schema shared by the Claude and
+OpenAI enrichment modules, so the providers return machine-validated JSON
+instead of free text we have to scan and repair.
+"""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+class Relationship(BaseModel):
+    """A relationship between two healthcare entities"""
+
+    model_config = ConfigDict(extra="forbid")
+
+    target: str
+    type: Literal["owned_by", "owns", "partner", "competitor", "customer", "vendor"]
+
+class EntitySchema(BaseModel):
+    """The enriched entity record returned by the LLM"""
+
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    type: str
+    parent: Optional[str]
+    revenue: Optional[str]
+    subsidiaries: List[str]
+    relationships: List[Relationship]
+
+# JSON Schema used for Anthropic tool input and OpenAI structured outputs
+ENTITY_JSON_SCHEMA = EntitySchema.model_json_schema()
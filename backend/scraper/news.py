@@ -5,14 +5,13 @@ This module provides functions to scrape healthcare entity information from news
 """
 
 import os
+import re
 import requests
 import random
 from dotenv import load_dotenv
 import logging
 from datetime import datetime, timedelta
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -26,6 +25,70 @@ USER_AGENT = os.getenv('USER_AGENT', 'HealthMap/1.0 (Research Project)')
 # NEWS_API_KEY = os.getenv('NEWS_API_KEY')
 # NEWS_API_URL = "https://newsapi.org/v2/everything"
 
+def _unitedhealth_news(entity_name):
+    """Placeholder articles for UnitedHealth/Optum entities"""
+    return [
+        {
+            "title": f"{entity_name} Expands Digital Health Initiatives",
+            "source": "Healthcare Innovation News",
+            "date": (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d'),
+            "url": "#",
+            "summary": f"{entity_name} announced new digital health partnerships focusing on telehealth expansion and AI-driven diagnostics."
+        },
+        {
+            "title": f"{entity_name} Reports Strong Q2 Earnings",
+            "source": "Financial Health Daily",
+            "date": (datetime.now() - timedelta(days=15)).strftime('%Y-%m-%d'),
+            "url": "#",
+            "summary": f"{entity_name} exceeded analyst expectations with Q2 earnings, citing growth in Medicare Advantage enrollment."
+        }
+    ]
+
+def _anthem_news(entity_name):
+    """Placeholder articles for Elevance/Anthem entities"""
+    return [
+        {
+            "title": f"{entity_name} Completes Acquisition of Behavioral Health Provider",
+            "source": "Merger Monitor",
+            "date": (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'),
+            "url": "#",
+            "summary": f"{entity_name} has finalized its acquisition of a major behavioral health provider network, expanding its mental health services."
+        }
+    ]
+
+def _kaiser_news(entity_name):
+    """Placeholder articles for Kaiser entities"""
+    return [
+        {
+            "title": f"{entity_name} Launches New Preventive Care Initiative",
+            "source": "Prevention Health Weekly",
+            "date": (datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d'),
+            "url": "#",
+            "summary": f"{entity_name} is investing $200M in preventive care programs targeting chronic disease management."
+        }
+    ]
+
+def _default_news(entity_name):
+    """Placeholder article for any other entity"""
+    return [
+        {
+            "title": f"{entity_name} in Healthcare News",
+            "source": "Health Industry Today",
+            "date": (datetime.now() - timedelta(days=random.randint(1, 30))).strftime('%Y-%m-%d'),
+            "url": "#",
+            "summary": f"Recent developments related to {entity_name} in the healthcare sector."
+        }
+    ]
+
+# Keyword -> template dispatch table, compiled once at import. A real news
+# API integration can swap the templates for fetchers without touching
+# scrape_recent_news or its callers.
+_RULES = [
+    (re.compile(r"UnitedHealth|Optum"), _unitedhealth_news),
+    (re.compile(r"Elevance|Anthem"), _anthem_news),
+    (re.compile(r"Kaiser"), _kaiser_news),
+]
+
 def scrape_recent_news(entity_name, days_back=30):
     """
     Scrape recent news about a healthcare entity.
@@ -37,7 +100,7 @@ def scrape_recent_news(entity_name, days_back=30):
     Returns:
         list: List of news articles with title, source, date, and summary
     """
-    logger.info(f"Scraping recent news for: {entity_name} (last {days_back} days)")
+    logger.info("Scraping recent news for: %s (last %s days)", entity_name, days_back)
     
     # TODO: In a production environment, integrate with a proper news API
     # For now, return a placeholder with instructions
@@ -82,68 +145,25 @@ def scrape_recent_news(entity_name, days_back=30):
                 "summary": article.get("description", "")
             })
         
-        logger.info(f"Found {len(results)} news articles for {entity_name}")
+        logger.info("Found %s news articles for %s", len(results), entity_name)
         return results
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching news for {entity_name}: {str(e)}")
+        logger.error("Error fetching news for %s: %s", entity_name, e)
         return []
     except Exception as e:
-        logger.error(f"Unexpected error fetching news for {entity_name}: {str(e)}")
+        logger.error("Unexpected error fetching news for %s: %s", entity_name, e)
         return []
     """
     
     # For MVP, return placeholder data
     logger.warning("Using placeholder news data - integrate with a news API for production")
-    
-    # Return some placeholder data based on the entity name
-    if "UnitedHealth" in entity_name or "Optum" in entity_name:
-        return [
-            {
-                "title": f"{entity_name} Expands Digital Health Initiatives",
-                "source": "Healthcare Innovation News",
-                "date": (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d'),
-                "url": "#",
-                "summary": f"{entity_name} announced new digital health partnerships focusing on telehealth expansion and AI-driven diagnostics."
-            },
-            {
-                "title": f"{entity_name} Reports Strong Q2 Earnings",
-                "source": "Financial Health Daily",
-                "date": (datetime.now() - timedelta(days=15)).strftime('%Y-%m-%d'),
-                "url": "#",
-                "summary": f"{entity_name} exceeded analyst expectations with Q2 earnings, citing growth in Medicare Advantage enrollment."
-            }
-        ]
-    elif "Elevance" in entity_name or "Anthem" in entity_name:
-        return [
-            {
-                "title": f"{entity_name} Completes Acquisition of Behavioral Health Provider",
-                "source": "Merger Monitor",
-                "date": (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'),
-                "url": "#",
-                "summary": f"{entity_name} has finalized its acquisition of a major behavioral health provider network, expanding its mental health services."
-            }
-        ]
-    elif "Kaiser" in entity_name:
-        return [
-            {
-                "title": f"{entity_name} Launches New Preventive Care Initiative",
-                "source": "Prevention Health Weekly",
-                "date": (datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d'),
-                "url": "#",
-                "summary": f"{entity_name} is investing $200M in preventive care programs targeting chronic disease management."
-            }
-        ]
-    else:
-        return [
-            {
-                "title": f"{entity_name} in Healthcare News",
-                "source": "Health Industry Today",
-                "date": (datetime.now() - timedelta(days=random.randint(1, 30))).strftime('%Y-%m-%d'),
-                "url": "#",
-                "summary": f"Recent developments related to {entity_name} in the healthcare sector."
-            }
-        ]
+
+    # Dispatch on the precompiled rule table; first matching rule wins
+    for pattern, template in _RULES:
+        if pattern.search(entity_name):
+            return template(entity_name)
+    return _default_news(entity_name)
 
 # For testing
 if __name__ == "__main__":
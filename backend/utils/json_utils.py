@@ -6,14 +6,17 @@ and validating entity JSON files.
 """
 
 import os
-import json
 import logging
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Schema constants, built once at import instead of per validation call
+_REQUIRED_FIELDS = ("name", "type")
+_VALID_REL_TYPES = frozenset({"owned_by", "owns", "partner", "competitor", "customer", "vendor"})
+
 def save_entity_json(entity_data, filepath):
     """
     Save entity data to a JSON file
@@ -26,20 +29,22 @@ def save_entity_json(entity_data, filepath):
         bool: True if successful, False otherwise
     """
     try:
-        # Create directory if it doesn't exist
-        directory = os.path.dirname(filepath)
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            logger.info(f"Created directory: {directory}")
-        
-        # Save the JSON file with pretty formatting
-        with open(filepath, 'w') as f:
-            json.dump(entity_data, f, indent=2)
-        
-        logger.info(f"Saved entity data to {filepath}")
+        # Create directory if it doesn't exist; exist_ok avoids the
+        # exists()+makedirs() race between concurrent batch workers
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+
+        # Write to a temp file and rename so a crash mid-write never leaves
+        # a truncated entity file behind (os.replace is atomic). Sorted keys
+        # keep repeat saves byte-identical for diffing.
+        tmp_filepath = filepath + ".tmp"
+        with open(tmp_filepath, 'wb') as f:
+            f.write(orjson.dumps(entity_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        os.replace(tmp_filepath, filepath)
+
+        logger.info("Saved entity data to %s", filepath)
         return True
     except Exception as e:
-        logger.error(f"Error saving entity data to {filepath}: {str(e)}")
+        logger.error("Error saving entity data to %s: %s", filepath, e)
         return False
 
 def load_entity_json(filepath):
@@ -53,20 +58,21 @@ def load_entity_json(filepath):
         dict: Entity data, or None if the file doesn't exist or is invalid
     """
     try:
-        if not os.path.exists(filepath):
-            logger.warning(f"Entity file does not exist: {filepath}")
-            return None
-        
-        with open(filepath, 'r') as f:
-            entity_data = json.load(f)
-        
-        logger.info(f"Loaded entity data from {filepath}")
+        # Rely on open() raising instead of a separate exists() check; that
+        # avoids a stat per file and is race-free
+        with open(filepath, 'rb') as f:
+            entity_data = orjson.loads(f.read())
+
+        logger.info("Loaded entity data from %s", filepath)
         return entity_data
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in {filepath}: {str(e)}")
+    except FileNotFoundError:
+        logger.warning("Entity file does not exist: %s", filepath)
+        return None
+    except orjson.JSONDecodeError as e:
+        logger.error("Invalid JSON in %s: %s", filepath, e)
         return None
     except Exception as e:
-        logger.error(f"Error loading entity data from {filepath}: {str(e)}")
+        logger.error("Error loading entity data from %s: %s", filepath, e)
         return None
 
 def load_all_entities(directory="data/entities"):
@@ -80,25 +86,26 @@ def load_all_entities(directory="data/entities"):
         list: List of entity data dictionaries
     """
     entities = []
-    
+
     try:
-        if not os.path.exists(directory):
-            logger.warning(f"Entities directory does not exist: {directory}")
-            return entities
-        
-        # Get all JSON files in the directory
-        json_files = [f for f in os.listdir(directory) if f.endswith('.json')]
-        
-        for filename in json_files:
-            filepath = os.path.join(directory, filename)
-            entity_data = load_entity_json(filepath)
-            if entity_data:
-                entities.append(entity_data)
-        
-        logger.info(f"Loaded {len(entities)} entities from {directory}")
+        # scandir returns paths with directory entries already stat'ed, and
+        # the thread pool overlaps the per-file reads. Let it raise on a
+        # missing directory instead of paying a separate exists() stat.
+        with os.scandir(directory) as it:
+            filepaths = [entry.path for entry in it
+                         if entry.name.endswith('.json') and entry.is_file()]
+
+        if filepaths:
+            with ThreadPoolExecutor(max_workers=min(32, len(filepaths))) as executor:
+                entities = [entity for entity in executor.map(load_entity_json, filepaths) if entity]
+
+        logger.info("Loaded %s entities from %s", len(entities), directory)
+        return entities
+    except FileNotFoundError:
+        logger.warning("Entities directory does not exist: %s", directory)
         return entities
     except Exception as e:
-        logger.error(f"Error loading entities from {directory}: {str(e)}")
+        logger.error("Error loading entities from %s: %s", directory, e)
         return entities
 
 def validate_entity_json(entity_data):
@@ -112,38 +119,39 @@ def validate_entity_json(entity_data):
         tuple: (is_valid, errors) where is_valid is a boolean and errors is a list of error messages
     """
     errors = []
-    
-    # Check required fields
-    required_fields = ["name", "type"]
-    for field in required_fields:
+
+    # Check required fields; missing ones mean the enrichment failed
+    # outright, so report them without inspecting the rest
+    for field in _REQUIRED_FIELDS:
         if field not in entity_data:
             errors.append(f"Missing required field: {field}")
-    
-    # Check that relationships is a list if present
-    if "relationships" in entity_data and not isinstance(entity_data["relationships"], list):
-        errors.append("Field 'relationships' must be a list")
-    
+    if errors:
+        return False, errors
+
     # Check that subsidiaries is a list if present
     if "subsidiaries" in entity_data and not isinstance(entity_data["subsidiaries"], list):
         errors.append("Field 'subsidiaries' must be a list")
-    
-    # Check relationship format if present
-    if "relationships" in entity_data and isinstance(entity_data["relationships"], list):
-        for i, rel in enumerate(entity_data["relationships"]):
-            if not isinstance(rel, dict):
-                errors.append(f"Relationship at index {i} must be an object")
-                continue
-            
-            if "target" not in rel:
-                errors.append(f"Relationship at index {i} missing required field: target")
-            
-            if "type" not in rel:
-                errors.append(f"Relationship at index {i} missing required field: type")
-            
-            valid_types = ["owned_by", "owns", "partner", "competitor", "customer", "vendor"]
-            if "type" in rel and rel["type"] not in valid_types:
-                errors.append(f"Relationship at index {i} has invalid type: {rel['type']}")
-    
+
+    # Check relationships in a single pass: type of the field, then each element
+    relationships = entity_data.get("relationships")
+    if relationships is not None:
+        if not isinstance(relationships, list):
+            errors.append("Field 'relationships' must be a list")
+        else:
+            for i, rel in enumerate(relationships):
+                if not isinstance(rel, dict):
+                    errors.append(f"Relationship at index {i} must be an object")
+                    continue
+
+                if "target" not in rel:
+                    errors.append(f"Relationship at index {i} missing required field: target")
+
+                rel_type = rel.get("type")
+                if rel_type is None:
+                    errors.append(f"Relationship at index {i} missing required field: type")
+                elif rel_type not in _VALID_REL_TYPES:
+                    errors.append(f"Relationship at index {i} has invalid type: {rel_type}")
+
     is_valid = len(errors) == 0
     return is_valid, errors
 
@@ -173,23 +181,26 @@ def merge_entity_data(existing_data, new_data):
     if "subsidiaries" in new_data and new_data["subsidiaries"]:
         if "subsidiaries" not in merged_data:
             merged_data["subsidiaries"] = []
-        
-        # Add new subsidiaries that don't already exist
+
+        # Track existing subsidiaries in a set so each membership check is
+        # O(1) instead of a list scan per new subsidiary
+        existing_subsidiaries = set(merged_data["subsidiaries"])
         for subsidiary in new_data["subsidiaries"]:
-            if subsidiary not in merged_data["subsidiaries"]:
+            if subsidiary not in existing_subsidiaries:
                 merged_data["subsidiaries"].append(subsidiary)
-    
+                existing_subsidiaries.add(subsidiary)
+
     # Merge relationships
     if "relationships" in new_data and new_data["relationships"]:
+        # Create a set of existing relationships for faster lookup
+        existing_relationships = {(rel["target"], rel["type"]) for rel in merged_data.get("relationships", [])}
+
         if "relationships" not in merged_data:
             merged_data["relationships"] = []
-        
-        # Create a set of existing relationships for faster lookup
-        existing_relationships = {(rel["target"], rel["type"]) for rel in merged_data["relationships"]}
-        
+
         # Add new relationships that don't already exist
         for rel in new_data["relationships"]:
-            if ("target" in rel and "type" in rel and 
+            if ("target" in rel and "type" in rel and
                 (rel["target"], rel["type"]) not in existing_relationships):
                 merged_data["relationships"].append(rel)
                 existing_relationships.add((rel["target"], rel["type"]))
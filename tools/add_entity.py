@@ -31,7 +31,7 @@ def add_entity(entity_name, force=False):
     Returns:
         bool: True if successful, False otherwise
     """
-    logger.info(f"Adding entity: {entity_name}")
+    logger.info("Adding entity: %s", entity_name)
     
     # Normalize entity name for filename
     entity_filename = entity_name.lower().replace(" ", "_").replace("/", "_")
@@ -39,18 +39,18 @@ def add_entity(entity_name, force=False):
     
     # Check if entity already exists
     if os.path.exists(entity_filepath) and not force:
-        logger.error(f"Entity already exists: {entity_name}")
-        logger.error(f"Use --force to overwrite")
+        logger.error("Entity already exists: %s", entity_name)
+        logger.error("Use --force to overwrite")
         return False
     
     # Process the entity
     result = process_entity(entity_name, update_existing=force)
     
     if "error" in result:
-        logger.error(f"Error processing {entity_name}: {result['error']}")
+        logger.error("Error processing %s: %s", entity_name, result['error'])
         return False
     
-    logger.info(f"Successfully added {entity_name}")
+    logger.info("Successfully added %s", entity_name)
     return True
 
 def main():
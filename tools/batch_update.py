@@ -8,28 +8,33 @@ This script processes multiple healthcare entities in batch.
 import os
 import sys
 import csv
+import asyncio
 import argparse
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add the parent directory to the path so we can import from backend
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import the process_entity function from the backend
-from backend.main import process_entity
+# Import the entity processors from the backend
+from backend.main import process_entity, process_entity_async
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def process_entity_wrapper(entity_name, update_existing=True):
+def _process_entity_in_worker(entity_name, update_existing=True):
     """
-    Wrapper function for process_entity to handle exceptions
-    
+    Process one entity inside a worker process
+
+    Module-level so it is picklable for ProcessPoolExecutor. Each worker
+    process builds its own HTTP sessions and API clients at import, so
+    connection pools are reused within a worker.
+
     Args:
         entity_name (str): Name of the healthcare entity
         update_existing (bool): Whether to update existing entity data
-        
+
     Returns:
         tuple: (entity_name, success, error_message)
     """
@@ -41,92 +46,186 @@ def process_entity_wrapper(entity_name, update_existing=True):
     except Exception as e:
         return (entity_name, False, str(e))
 
-def batch_process(input_file=None, text_file=None, entity_list=None, update_existing=True, max_workers=4):
+async def process_entity_wrapper(entity_name, update_existing=True):
+    """
+    Wrapper coroutine for process_entity_async to handle exceptions
+
+    Args:
+        entity_name (str): Name of the healthcare entity
+        update_existing (bool): Whether to update existing entity data
+
+    Returns:
+        tuple: (entity_name, success, error_message)
+    """
+    try:
+        result = await process_entity_async(entity_name, update_existing=update_existing)
+        if "error" in result:
+            return (entity_name, False, result["error"])
+        return (entity_name, True, None)
+    except Exception as e:
+        return (entity_name, False, str(e))
+
+async def _process_all(entities, update_existing, max_workers):
+    """
+    Run all entities through the event loop with bounded concurrency
+
+    The work is I/O-bound (HTTP waits), so a single event loop multiplexes
+    the in-flight requests; the semaphore caps concurrency to avoid
+    rate-limit storms against Wikipedia and the LLM API.
+
+    Args:
+        entities (list): Entity names to process
+        update_existing (bool): Whether to update existing entity data
+        max_workers (int): Base concurrency setting from the --workers flag
+
+    Returns:
+        list: (entity_name, success, error_message) tuples in completion order
+    """
+    # Coroutines are far cheaper than OS threads, so the same --workers
+    # setting supports a higher in-flight bound
+    semaphore = asyncio.Semaphore(max_workers * 4)
+
+    async def process_with_limit(entity_name):
+        async with semaphore:
+            return await process_entity_wrapper(entity_name, update_existing=update_existing)
+
+    results = []
+    for task in asyncio.as_completed([process_with_limit(entity) for entity in entities]):
+        results.append(await task)
+    return results
+
+def _read_csv_entities(input_file):
+    """
+    Stream entity names from a CSV file, one row at a time
+
+    Args:
+        input_file (str): Path to CSV file with entity names
+
+    Yields:
+        str: Entity names from the first column
+    """
+    with open(input_file, 'r') as f:
+        # Detect a header by inspecting the first cell instead of running
+        # csv.Sniffer's heuristic over a sample (which also misfires on
+        # single-column files). If the first line isn't a header, rewind so
+        # the reader sees it as data.
+        first_line = f.readline()
+        first_cell = first_line.split(',')[0].strip().strip('"').lower()
+        if first_cell not in ('name', 'entity', 'entity_name'):
+            f.seek(0)
+
+        for row in csv.reader(f):
+            if row and row[0].strip():
+                yield row[0].strip()
+
+def _read_text_entities(text_file):
+    """
+    Stream entity names from a text file, one line at a time
+
+    Args:
+        text_file (str): Path to text file with newline-separated entity names
+
+    Yields:
+        str: Entity names
+    """
+    with open(text_file, 'r') as f:
+        for line in f:
+            entity_name = line.strip()
+            if entity_name:
+                yield entity_name
+
+def _dedupe(entity_names):
+    """
+    Drop duplicate entity names while preserving input order
+
+    Duplicates in the input would be scraped and enriched twice for the
+    same result, so they are filtered at read time.
+
+    Args:
+        entity_names (iterable): Entity names, possibly with duplicates
+
+    Returns:
+        list: Unique entity names in first-seen order
+    """
+    seen = set()
+    unique = []
+    for name in entity_names:
+        if name not in seen:
+            seen.add(name)
+            unique.append(name)
+    return unique
+
+def batch_process(input_file=None, text_file=None, entity_list=None, update_existing=True,
+                  max_workers=4, use_processes=False):
     """
     Process multiple healthcare entities in batch
-    
+
     Args:
         input_file (str, optional): Path to CSV file with entity names
         text_file (str, optional): Path to text file with newline-separated entity names
         entity_list (list, optional): List of entity names to process
         update_existing (bool): Whether to update existing entity data
-        max_workers (int): Maximum number of concurrent workers
-        
+        max_workers (int): Base concurrency setting (in-flight bound is 4x this
+            on the event loop; worker count with --processes)
+        use_processes (bool): Run entities in a process pool instead of the
+            event loop, sidestepping the GIL when parsing dominates
+
     Returns:
-        tuple: (success_count, failure_count, failures)
+        tuple: (successes, failures) where successes is a list of entity
+            names and failures a list of (entity_name, error) pairs
     """
-    entities = []
-    
     if input_file:
-        # Read entities from CSV file
+        # Stream entities from CSV file
         try:
-            with open(input_file, 'r') as f:
-                reader = csv.reader(f)
-                
-                # Check if the file has a header
-                has_header = csv.Sniffer().has_header(f.read(1024))
-                f.seek(0)
-                
-                # Skip header if it exists
-                if has_header:
-                    next(reader)
-                
-                for row in reader:
-                    if row and row[0].strip():
-                        entities.append(row[0].strip())
+            entities = _dedupe(_read_csv_entities(input_file))
         except Exception as e:
-            logger.error(f"Error reading CSV file: {str(e)}")
-            return (0, 0, [])
+            logger.error("Error reading CSV file: %s", e)
+            return ([], [])
     elif text_file:
-        # Read entities from text file (one per line)
+        # Stream entities from text file (one per line)
         try:
-            with open(text_file, 'r') as f:
-                for line in f:
-                    entity_name = line.strip()
-                    if entity_name:
-                        entities.append(entity_name)
+            entities = _dedupe(_read_text_entities(text_file))
         except Exception as e:
-            logger.error(f"Error reading text file: {str(e)}")
-            return (0, 0, [])
+            logger.error("Error reading text file: %s", e)
+            return ([], [])
     elif entity_list:
-        entities = entity_list
+        entities = _dedupe(entity_list)
     else:
         logger.error("Either input_file or entity_list must be provided")
-        return (0, 0, [])
-    
+        return ([], [])
+
     if not entities:
         logger.warning("No entities to process")
-        return (0, 0, [])
+        return ([], [])
     
-    logger.info(f"Processing {len(entities)} entities...")
+    logger.info("Processing %s entities...", len(entities))
     
-    success_count = 0
-    failure_count = 0
+    successes = []
     failures = []
     
-    # Process entities in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_entity = {
-            executor.submit(process_entity_wrapper, entity, update_existing): entity
-            for entity in entities
-        }
-        
-        # Process results as they complete
-        for future in as_completed(future_to_entity):
-            entity_name, success, error = future.result()
-            
-            if success:
-                logger.info(f"✓ Successfully processed {entity_name}")
-                success_count += 1
-            else:
-                logger.error(f"✗ Error processing {entity_name}: {error}")
-                failures.append((entity_name, error))
-                failure_count += 1
-    
-    logger.info(f"Batch processing complete: {success_count} succeeded, {failure_count} failed")
-    
-    return (success_count, failure_count, failures)
+    if use_processes:
+        # CPU-heavy fallback: each worker is a full interpreter with its own
+        # parser and sessions, so HTML parsing scales across cores
+        workers = max_workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_entity_in_worker, entity, update_existing)
+                       for entity in entities]
+            results = [future.result() for future in as_completed(futures)]
+    else:
+        # Process entities concurrently on a single event loop
+        results = asyncio.run(_process_all(entities, update_existing, max_workers))
+
+    for entity_name, success, error in results:
+        if success:
+            logger.info("✓ Successfully processed %s", entity_name)
+            successes.append(entity_name)
+        else:
+            logger.error("✗ Error processing %s: %s", entity_name, error)
+            failures.append((entity_name, error))
+
+    logger.info("Batch processing complete: %s succeeded, %s failed", len(successes), len(failures))
+
+    return (successes, failures)
 
 def main():
     """
@@ -138,6 +237,8 @@ def main():
     parser.add_argument("-e", "--entities", nargs="+", help="List of entity names to process")
     parser.add_argument("--no-update", action="store_true", help="Don't update existing entity data")
     parser.add_argument("-w", "--workers", type=int, default=4, help="Maximum number of concurrent workers")
+    parser.add_argument("--processes", action="store_true",
+                        help="Use a process pool instead of the event loop (for CPU-bound parsing)")
     parser.add_argument("-o", "--output", help="Output file for results (CSV)")
     
     args = parser.parse_args()
@@ -146,32 +247,26 @@ def main():
         parser.error("Either --file, --text, or --entities must be provided")
     
     # Process entities
-    success_count, failure_count, failures = batch_process(
-        args.file, args.text, args.entities, not args.no_update, args.workers
+    successes, failures = batch_process(
+        args.file, args.text, args.entities, not args.no_update, args.workers,
+        use_processes=args.processes
     )
-    
+
     # Write results to output file if specified
-    if args.output and (success_count > 0 or failure_count > 0):
+    if args.output and (successes or failures):
         try:
             with open(args.output, 'w', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow(["Entity", "Status", "Error"])
-                
-                # Write successes
-                for entity in (args.entities or []):
-                    if entity not in [f[0] for f in failures]:
-                        writer.writerow([entity, "Success", ""])
-                
-                # Write failures
-                for entity, error in failures:
-                    writer.writerow([entity, "Failure", error])
-            
-            logger.info(f"Results written to {args.output}")
+                writer.writerows((entity, "Success", "") for entity in successes)
+                writer.writerows((entity, "Failure", error) for entity, error in failures)
+
+            logger.info("Results written to %s", args.output)
         except Exception as e:
-            logger.error(f"Error writing results to {args.output}: {str(e)}")
+            logger.error("Error writing results to %s: %s", args.output, e)
     
     # Return success if all entities were processed successfully
-    return 0 if failure_count == 0 else 1
+    return 0 if not failures else 1
 
 if __name__ == "__main__":
     sys.exit(main())